@@ -1,19 +1,26 @@
+import json
 import os
-import pickle
+import sys
 from pathlib import Path
+from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import GMAIL_CREDENTIALS_PATH, GMAIL_TOKEN_PATH
+
 # SCOPES determines the level of access for Gmail API.
 # 'readonly' is the safest for simple retrieval tasks.
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
 # Path to your OAuth 2.0 Client Credentials file (downloaded from Google Cloud Console)
-CREDENTIALS_FILE = 'auth/credentials/credentials.json'
+CREDENTIALS_FILE = GMAIL_CREDENTIALS_PATH
 
-# Path to the token file where access/refresh tokens will be saved
-TOKEN_FILE = 'auth/credentials/token.pickle'
+# Path to the token file where access/refresh tokens will be saved (JSON, not
+# pickle: safe across google-auth upgrades and if the file is ever tampered with)
+TOKEN_FILE = GMAIL_TOKEN_PATH
 
 
 def get_gmail_service():
@@ -32,8 +39,9 @@ def get_gmail_service():
     token_path = Path(TOKEN_FILE)
     # Attempt to load previously saved credentials
     if token_path.exists():
-        with open(token_path, 'rb') as token:
-            creds = pickle.load(token)
+        creds = Credentials.from_authorized_user_info(
+            json.loads(token_path.read_text()), SCOPES
+        )
 
     # If no credentials or they're invalid/expired, initiate auth flow
     if not creds or not creds.valid:
@@ -46,8 +54,7 @@ def get_gmail_service():
             )
             creds = flow.run_local_server(port=0)
         # Save new credentials for next time
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
+        token_path.write_text(creds.to_json())
     # Build and return the Gmail API service object
     service = build('gmail', 'v1', credentials=creds)
     return service
@@ -13,6 +13,9 @@ EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '768'))  # nomic-embe
 # Llama Configuration
 OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'nomic-embed-text')
+# Use the native batch embedding endpoint (/api/embed, Ollama >= 0.1.34).
+# Set to 'false' to fall back to per-text /api/embeddings calls on older servers.
+OLLAMA_BATCH_EMBED = os.getenv('OLLAMA_BATCH_EMBED', 'true').lower() == 'true'
 LLAMA_MODEL = os.getenv('LLAMA_3_2_MODEL', 'llama3.2')
 REPLICATE_API_TOKEN = os.getenv('REPLICATE_API_TOKEN')
 REPLICATE_MODEL = os.getenv('REPLICATE_MODEL', 'meta/llama-3.1-70b-instruct')
@@ -21,12 +24,20 @@ REPLICATE_MODEL = os.getenv('REPLICATE_MODEL', 'meta/llama-3.1-70b-instruct')
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_ENV = os.getenv('PINECONE_ENV')
 PINECONE_INDEX_NAME = os.getenv('PINECONE_INDEX_NAME', 'gmail-rag-index')
+# Quantize vector values to int8 before upsert/query (smaller request
+# payloads, <1% typical recall loss; the dense index itself is unchanged).
+# Mixing quantized and unquantized vectors in one index is fine for the
+# cosine metric, since scaling doesn't affect the ranking.
+EMBEDDING_INT8 = os.getenv('EMBEDDING_INT8', 'false').lower() == 'true'
 
 # Gmail Configuration
 GMAIL_SCOPES = [os.getenv('GMAIL_SCOPES', 'https://www.googleapis.com/auth/gmail.readonly')]
 GMAIL_CREDENTIALS_PATH = 'auth/credentials/credentials.json'
 GMAIL_TOKEN_PATH = 'auth/credentials/token.json'
 
+# Embedding cache (SQLite file; set to '' to disable caching)
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', 'embedding_cache.db')
+
 # RAG Configuration
 MAX_CONTEXT_LENGTH = 3000
 TOP_K_RESULTS = 5
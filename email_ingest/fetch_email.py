@@ -1,10 +1,49 @@
-import base64
 import quopri
 import re
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict
+from itertools import islice
+from typing import Dict, Iterator, List
 from googleapiclient.errors import HttpError
 
+# pybase64 is a drop-in SIMD-accelerated decoder (5-10x faster);
+# fall back to the stdlib when it isn't installed
+try:
+    from pybase64 import urlsafe_b64decode
+except ImportError:
+    from base64 import urlsafe_b64decode
+
+# simdutf validates UTF-8 at close to memcpy speed; optional like pybase64
+try:
+    from simdutf import validate_utf8
+except ImportError:
+    validate_utf8 = None
+
+# Gmail batch requests are capped at 100 calls per batch
+BATCH_SIZE = 100
+
+
+def _decode_utf8(raw: bytes) -> str:
+    """
+    Decode bytes as UTF-8, dropping invalid sequences.
+    When simdutf is available, valid input (the common case) takes a
+    SIMD-validated fast path that skips CPython's error-handling decode.
+    """
+    if validate_utf8 is not None and validate_utf8(raw):
+        return raw.decode('utf-8')
+    return raw.decode('utf-8', errors='ignore')
+
+# Compiled once at import so the per-email hot path skips re-module dispatch.
+# One alternation handles HTML tags and whitespace together, so cleaning is
+# a single pass over the text instead of two full sweeps.
+_CLEAN_RE = re.compile(r'(?:<[^>]+>|\s+)+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def _clean_repl(match) -> str:
+    # A run of tags alone vanishes; a run containing any whitespace
+    # between tags collapses to a single space
+    return ' ' if _TAG_RE.sub('', match.group(0)) else ''
+
 def clean_text(text: str) -> str:
     """
     Basic cleaning of email text:
@@ -15,36 +54,25 @@ def clean_text(text: str) -> str:
     # Skip quoted-printable decoding if text is already a string
     # (it's already been decoded from base64)
     
-    # Remove HTML tags (naive)
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Replace multiple spaces/newlines with single space
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # Strip HTML tags (naive) and collapse whitespace in one sweep
+    return _CLEAN_RE.sub(_clean_repl, text).strip()
 
 def extract_email_body(payload: Dict) -> str:
     """
-    Recursively extract plain text body from email payload parts.
-    Handles multipart emails.
-    """
-    if 'parts' in payload:
-        # Recursively check parts for text/plain content
-        for part in payload['parts']:
-            if part.get('mimeType') == 'text/plain' and 'data' in part['body']:
-                data = part['body']['data']
-                text = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-                return clean_text(text)
-            elif part.get('mimeType', '').startswith('multipart/'):
-                # Recursive call
-                text = extract_email_body(part)
-                if text:
-                    return text
-    else:
-        # Single part email
-        if payload.get('mimeType') == 'text/plain' and 'data' in payload.get('body', {}):
-            data = payload['body']['data']
-            text = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+    Extract the first text/plain body from an email payload.
+    Handles multipart emails with an explicit stack (iterative DFS),
+    so deeply nested multipart trees can't exhaust the Python stack.
+    """
+    stack = deque([payload])
+    while stack:
+        part = stack.pop()
+        if part.get('mimeType') == 'text/plain' and 'data' in part.get('body', {}):
+            data = part['body']['data']
+            text = _decode_utf8(urlsafe_b64decode(data))
             return clean_text(text)
+        if 'parts' in part:
+            # Reversed so parts are visited in left-to-right order
+            stack.extend(reversed(part['parts']))
     return ""
 
 def get_date_query(days_back: int = 7) -> str:
@@ -68,34 +96,9 @@ def fetch_emails(service, user_id='me', query: str = '', max_results: int = 10)
     """
     emails = []
     try:
-        # Ensure query is ASCII-encoded
-        if query:
-            query = query.encode('ascii', 'ignore').decode('ascii')
-        
-        results = service.users().messages().list(userId=user_id, q=query, maxResults=max_results).execute()
-        messages = results.get('messages', [])
-        
-        for msg in messages:
-            msg_detail = service.users().messages().get(userId=user_id, id=msg['id'], format='full').execute()
-            payload = msg_detail.get('payload', {})
-            headers = payload.get('headers', [])
-            
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-            from_email = next((h['value'] for h in headers if h['name'] == 'From'), '')
-            snippet = msg_detail.get('snippet', '')
-            body = extract_email_body(payload)
-            
-            emails.append({
-                'id': msg['id'],
-                'threadId': msg_detail.get('threadId', ''),
-                'subject': subject,
-                'date': date,
-                'from': from_email,
-                'snippet': snippet,
-                'body': body
-            })
-
+        page_size = min(max_results, BATCH_SIZE)
+        emails = list(iter_emails(service, user_id, query,
+                                  page_size=page_size, max_results=max_results))
     except HttpError as error:
         print(f'An error occurred: {error}')
     except Exception as e:
@@ -104,6 +107,72 @@ def fetch_emails(service, user_id='me', query: str = '', max_results: int = 10)
         traceback.print_exc()
     return emails
 
+def iter_messages(service, user_id='me', query: str = '', page_size: int = 100) -> Iterator[Dict]:
+    """
+    Yield message stubs ({'id', 'threadId'}) across all list() pages,
+    following pageToken via list_next. One round-trip per page.
+    """
+    request = service.users().messages().list(userId=user_id, q=query, maxResults=page_size)
+    while request is not None:
+        response = request.execute()
+        yield from response.get('messages', [])
+        request = service.users().messages().list_next(request, response)
+
+def _fetch_details(service, user_id: str, stubs: List[Dict]) -> List[Dict]:
+    """
+    Fetch full details for up to BATCH_SIZE message stubs in one batched
+    multipart request, returning parsed email dicts in stub order.
+    """
+    # Collect parsed emails keyed by message ID so batch callbacks
+    # (which may complete in any order) can be reassembled in list order.
+    parsed = {}
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            print(f'Failed to fetch message {request_id}: {exception}')
+            return
+        payload = response.get('payload', {})
+        # One pass over the header list instead of a scan per header
+        hdr = {h['name']: h['value'] for h in payload.get('headers', [])}
+
+        parsed[request_id] = {
+            'id': request_id,
+            'threadId': response.get('threadId', ''),
+            'subject': hdr.get('Subject', '(No Subject)'),
+            'date': hdr.get('Date', ''),
+            'from': hdr.get('From', ''),
+            'snippet': response.get('snippet', ''),
+            'body': extract_email_body(payload)
+        }
+
+    batch = service.new_batch_http_request(callback=_collect)
+    for msg in stubs:
+        batch.add(
+            service.users().messages().get(userId=user_id, id=msg['id'], format='full'),
+            request_id=msg['id']
+        )
+    batch.execute()
+
+    return [parsed[msg['id']] for msg in stubs if msg['id'] in parsed]
+
+def iter_emails(service, user_id='me', query: str = '', page_size: int = 100,
+                max_results: int = None) -> Iterator[Dict]:
+    """
+    Stream parsed emails matching `query`: one list() round-trip per page
+    of IDs plus one batched details round-trip per BATCH_SIZE group, so
+    memory stays bounded at a page regardless of mailbox size.
+    """
+    # Ensure query is ASCII-encoded
+    if query:
+        query = query.encode('ascii', 'ignore').decode('ascii')
+
+    stubs = iter_messages(service, user_id, query, page_size)
+    if max_results is not None:
+        stubs = islice(stubs, max_results)
+
+    while group := list(islice(stubs, BATCH_SIZE)):
+        yield from _fetch_details(service, user_id, group)
+
 def fetch_last_week_emails(service, user_id='me', max_results: int = 10) -> List[Dict]:
     """
     Convenience function to fetch emails from the last 7 days.
@@ -111,3 +180,11 @@ def fetch_last_week_emails(service, user_id='me', max_results: int = 10) -> List
     query = get_date_query(days_back=7)
     return fetch_emails(service, user_id, query, max_results)
 
+def iter_last_week_emails(service, user_id='me', page_size: int = 100,
+                          max_results: int = None) -> Iterator[Dict]:
+    """
+    Streaming counterpart of fetch_last_week_emails for the ingest pipeline.
+    """
+    query = get_date_query(days_back=7)
+    return iter_emails(service, user_id, query, page_size, max_results)
+
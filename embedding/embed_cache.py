@@ -0,0 +1,58 @@
+import hashlib
+import os
+import sqlite3
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import EMBEDDING_CACHE_PATH
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key for a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(EMBEDDING_CACHE_PATH)
+    # Keyed on (content hash, model) so switching OLLAMA_MODEL never
+    # returns vectors from a different embedding space
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS emb ("
+        "  key TEXT NOT NULL,"
+        "  model TEXT NOT NULL,"
+        "  vec BLOB NOT NULL,"
+        "  PRIMARY KEY (key, model)"
+        ")"
+    )
+    return conn
+
+def get_cached(keys: List[str], model: str) -> Dict[str, np.ndarray]:
+    """
+    Look up cached vectors for the given keys.
+    Returns a dict mapping each found key to its float32 embedding;
+    missing keys are simply absent.
+    """
+    if not keys:
+        return {}
+    found = {}
+    with _connect() as conn:
+        placeholders = ','.join('?' * len(keys))
+        rows = conn.execute(
+            f"SELECT key, vec FROM emb WHERE model = ? AND key IN ({placeholders})",
+            [model] + keys
+        )
+        for key, blob in rows:
+            found[key] = np.frombuffer(blob, dtype=np.float32)
+    return found
+
+def put_cached(entries: Dict[str, np.ndarray], model: str):
+    """Store embeddings (key -> vector) as float32 blobs."""
+    if not entries:
+        return
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO emb (key, model, vec) VALUES (?, ?, ?)",
+            [(key, model, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in entries.items()]
+        )
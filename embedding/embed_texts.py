@@ -1,46 +1,125 @@
+import asyncio
 import os
 import sys
 from typing import List
-import requests
+import httpx
+import numpy as np
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import OLLAMA_BASE_URL, OLLAMA_MODEL
+from config.settings import (
+    OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_BATCH_EMBED,
+    EMBEDDING_CACHE_PATH, EMBEDDING_DIMENSION
+)
+from embedding.embed_cache import get_cached, put_cached, text_key
 
-def get_embeddings(texts: List[str], model: str = None) -> List[List[float]]:
+# Concurrent in-flight requests to the Ollama server
+MAX_CONCURRENCY = 8
+
+# Texts per request on the batch endpoint, to keep server VRAM bounded
+BATCH_SIZE = 64
+
+# Connection pool shared by all concurrent requests within one client
+_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+
+async def _embed_one(client: httpx.AsyncClient, model: str, text: str) -> List[float]:
+    """
+    Post a single text to the legacy embeddings endpoint and return its vector.
+    """
+    payload = {
+        "model": model,
+        "prompt": text
+    }
+
+    try:
+        response = await client.post(f"{OLLAMA_BASE_URL}/api/embeddings", json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json()["embedding"]
+    except httpx.HTTPError as e:
+        raise Exception(f"Ollama embedding API error: {e}")
+    except KeyError as e:
+        raise Exception(f"Unexpected response format from Ollama: {e}")
+
+async def _embed_chunk(client: httpx.AsyncClient, model: str, chunk: List[str]) -> List[List[float]]:
+    """
+    Embed one chunk of texts via the native batch endpoint (/api/embed)
+    in a single round-trip.
+    """
+    payload = {
+        "model": model,
+        "input": chunk
+    }
+
+    try:
+        response = await client.post(f"{OLLAMA_BASE_URL}/api/embed", json=payload, timeout=120)
+        response.raise_for_status()
+        return response.json()["embeddings"]
+    except httpx.HTTPError as e:
+        raise Exception(f"Ollama embedding API error: {e}")
+    except KeyError as e:
+        raise Exception(f"Unexpected response format from Ollama: {e}")
+
+async def _embed_all(model: str, texts: List[str]) -> List[List[float]]:
+    """
+    Embed texts via Ollama: batch endpoint chunks when enabled, otherwise
+    concurrent per-text requests. Results preserve input order.
     """
-    Generates embeddings for a list of texts using Ollama.
+    async with httpx.AsyncClient(limits=_LIMITS) as client:
+        if OLLAMA_BATCH_EMBED:
+            chunks = [texts[i:i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+            results = await asyncio.gather(*(_embed_chunk(client, model, c) for c in chunks))
+            return [vec for chunk_vecs in results for vec in chunk_vecs]
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+        async def bounded(text):
+            async with semaphore:
+                return await _embed_one(client, model, text)
+
+        return list(await asyncio.gather(*(bounded(t) for t in texts)))
+
+async def get_embeddings_async(texts: List[str], model: str = None) -> np.ndarray:
+    """
+    Generates embeddings for a list of texts using Ollama, with an
+    on-disk cache keyed by text content hash and model so repeated
+    ingests only embed texts the server hasn't seen before.
     Args:
         texts (List[str]): List of email bodies or snippets.
         model (str): Ollama model name for embeddings.
     Returns:
-        List[List[float]]: List of embedding vectors.
+        np.ndarray: float32 array of shape (len(texts), dim), in input order.
     """
     if model is None:
         model = OLLAMA_MODEL
-    
-    embeddings = []
-    url = f"{OLLAMA_BASE_URL}/api/embeddings"
-    
-    for i, text in enumerate(texts):
-        payload = {
-            "model": model,
-            "prompt": text
-        }
-        
-        try:
-            print(f"Processing text {i+1}/{len(texts)}...")
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            embedding = response.json()["embedding"]
-            embeddings.append(embedding)
-            print(f"✓ Completed {i+1}/{len(texts)}")
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Ollama embedding API error: {e}")
-        except KeyError as e:
-            raise Exception(f"Unexpected response format from Ollama: {e}")
-    
-    return embeddings
+
+    # np.stack needs at least one row, and the documented shape is
+    # (len(texts), dim) even when there's nothing to embed
+    if not texts:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+
+    if not EMBEDDING_CACHE_PATH:
+        return np.asarray(await _embed_all(model, texts), dtype=np.float32)
+
+    keys = [text_key(text) for text in texts]
+    hits = get_cached(keys, model)
+
+    # Embed only the cache misses, then write them back
+    miss_indices = [i for i, key in enumerate(keys) if key not in hits]
+    if miss_indices:
+        print(f"Embedding {len(miss_indices)} new texts ({len(texts) - len(miss_indices)} cached)...")
+        new_vectors = np.asarray(await _embed_all(model, [texts[i] for i in miss_indices]), dtype=np.float32)
+        put_cached({keys[i]: vec for i, vec in zip(miss_indices, new_vectors)}, model)
+        for i, vec in zip(miss_indices, new_vectors):
+            hits[keys[i]] = vec
+
+    return np.stack([hits[key] for key in keys])
+
+def get_embeddings(texts: List[str], model: str = None) -> np.ndarray:
+    """
+    Synchronous wrapper around get_embeddings_async for callers outside
+    an event loop.
+    """
+    return asyncio.run(get_embeddings_async(texts, model))
 
 if __name__ == "__main__":
     sample_texts = [
@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 
+def make_session() -> requests.Session:
+    """Session with a pooled adapter so repeated calls reuse connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
@@ -18,15 +29,14 @@ class LLMProvider(ABC):
 class OllamaProvider(LLMProvider):
     """Ollama LLM provider for local Llama models."""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2"):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2",
+                 session: Optional[requests.Session] = None):
         self.base_url = base_url
         self.model = model
+        self.session = session or make_session()
     
-    def generate(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2, **kwargs) -> str:
-        """Generate text using Ollama API."""
-        url = f"{self.base_url}/api/generate"
-        
-        payload = {
+    def _payload(self, prompt: str, max_tokens: int, temperature: float, **kwargs) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "prompt": prompt,
             "stream": False,
@@ -36,14 +46,32 @@ class OllamaProvider(LLMProvider):
                 "top_p": kwargs.get('top_p', 1),
             }
         }
-        
+
+    def generate(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2, **kwargs) -> str:
+        """Generate text using Ollama API."""
+        url = f"{self.base_url}/api/generate"
+        payload = self._payload(prompt, max_tokens, temperature, **kwargs)
+
         try:
-            response = requests.post(url, json=payload)
+            response = self.session.post(url, json=payload)
             response.raise_for_status()
             return response.json()['response'].strip()
         except requests.exceptions.RequestException as e:
             raise Exception(f"Ollama API error: {e}")
 
+    async def generate_async(self, prompt: str, max_tokens: int = 512, temperature: float = 0.2, **kwargs) -> str:
+        """Generate text using the Ollama API without blocking the event loop."""
+        url = f"{self.base_url}/api/generate"
+        payload = self._payload(prompt, max_tokens, temperature, **kwargs)
+
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, json=payload, timeout=None)
+                response.raise_for_status()
+                return response.json()['response'].strip()
+        except httpx.HTTPError as e:
+            raise Exception(f"Ollama API error: {e}")
+
 
 def get_llm_provider(provider_name: str, **config) -> LLMProvider:
     """Factory function to get the appropriate LLM provider."""
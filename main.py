@@ -9,17 +9,43 @@ Main script to run the complete Gmail RAG pipeline.
 
 import sys
 import os
+from itertools import islice
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import validate_config
 from auth.gmail_auth import get_gmail_service
-from email_ingest.fetch_email import fetch_last_week_emails
+from email_ingest.fetch_email import iter_last_week_emails
 from embedding.embed_texts import get_embeddings
-from vector_db.vector_store import init_pinecone, prepare_email_vectors, upsert_embeddings
+from vector_db.vector_store import init_pinecone, email_metadata, encode_vector, upsert_embeddings
 from rag_core.generate_answer import generate_answer
 
+# Emails processed per embed/upsert round; keeps peak memory at O(batch)
+INGEST_BATCH_SIZE = 64
+
+# Cap on emails pulled per ingest run (None streams the whole mailbox match)
+MAX_INGEST_EMAILS = 10
+
+def batched(iterable, n):
+    """Yield successive lists of up to n items from iterable."""
+    it = iter(iterable)
+    while batch := list(islice(it, n)):
+        yield batch
+
+def prepare_emails(emails):
+    """
+    Single pass over emails with content, yielding (text_to_embed,
+    partial_vector) pairs where the vector holds id and metadata and
+    only awaits its embedding values.
+    """
+    for email in emails:
+        # Use body if available, otherwise use snippet
+        content = email.get('body') or email.get('snippet', '')
+        if content.strip():
+            text = f"Subject: {email['subject']}\n\nContent: {content}"
+            yield text, {"id": email['id'], "metadata": email_metadata(email)}
+
 def ingest_emails():
     """Fetch emails from last week and store in vector database."""
     print("=" * 50)
@@ -43,69 +69,45 @@ def ingest_emails():
         print(f"❌ Gmail authentication failed: {e}")
         return False
     
-    # Fetch emails from last week
-    print("\n2. Fetching emails from the last 7 days...")
-    try:
-        emails = fetch_last_week_emails(service, max_results=10)
-        print(f"✓ Fetched {len(emails)} emails")
-        
-        if not emails:
-            print("No emails found in the last week.")
-            return False
-            
-        # Display sample of fetched emails
-        print("\nSample of fetched emails:")
-        for i, email in enumerate(emails[:10]):
-            print(f"  {i+1}. {email['subject'][:60]}... (from: {email['from'][:30]}...)")
-            
-    except Exception as e:
-        print(f"❌ Failed to fetch emails: {e}")
-        return False
-    
-    # Extract text content for embedding
-    print("\n3. Preparing email content for embedding...")
-    texts = []
-    valid_emails = []
-    
-    for email in emails:
-        # Use body if available, otherwise use snippet
-        content = email.get('body') or email.get('snippet', '')
-        if content.strip():
-            texts.append(f"Subject: {email['subject']}\n\nContent: {content}")
-            valid_emails.append(email)
-    
-    print(f"✓ Prepared {len(texts)} emails with content")
-    
-    # Generate embeddings
-    print("\n4. Generating embeddings...")
-    try:
-        embeddings = get_embeddings(texts)
-        print(f"✓ Generated {len(embeddings)} embeddings")
-    except Exception as e:
-        print(f"❌ Failed to generate embeddings: {e}")
-        return False
-    
+    # Stream emails from last week; pages are fetched lazily as the
+    # embedding pipeline below consumes them
+    print("\n2. Fetching emails from the last 7 days (streaming)...")
+    emails = iter_last_week_emails(service, max_results=MAX_INGEST_EMAILS)
+
     # Initialize Pinecone
-    print("\n5. Initializing vector database...")
+    print("\n3. Initializing vector database...")
     try:
         index = init_pinecone()
         print("✓ Vector database initialized")
     except Exception as e:
         print(f"❌ Failed to initialize vector database: {e}")
         return False
-    
-    # Prepare and upsert vectors
-    print("\n6. Storing embeddings in vector database...")
+
+    # Stream emails through embed + upsert in fixed-size batches so only
+    # one batch of texts and vectors is in memory at a time
+    print("\n4. Embedding and storing emails in batches...")
+    total_stored = 0
     try:
-        vectors = prepare_email_vectors(valid_emails, embeddings)
-        upsert_embeddings(index, vectors)
-        print(f"✓ Successfully stored {len(vectors)} email embeddings")
+        for batch in batched(prepare_emails(emails), INGEST_BATCH_SIZE):
+            embeddings = get_embeddings([text for text, _ in batch])
+            vectors = []
+            for (_, vector), embedding in zip(batch, embeddings):
+                values, extra = encode_vector(embedding)
+                vectors.append(dict(vector, values=values,
+                                    metadata={**vector["metadata"], **extra}))
+            upsert_embeddings(index, vectors)
+            total_stored += len(vectors)
+            print(f"✓ Stored {total_stored} email embeddings")
     except Exception as e:
-        print(f"❌ Failed to store embeddings: {e}")
+        print(f"❌ Failed to fetch, embed, and store emails: {e}")
         return False
-    
+
+    if total_stored == 0:
+        print("No emails with content found in the last week.")
+        return False
+
     print("\n✅ Email ingestion completed successfully!")
-    print(f"Total emails processed: {len(valid_emails)}")
+    print(f"Total emails processed: {total_stored}")
     return True
 
 def query_emails():
@@ -1,5 +1,8 @@
+import asyncio
+import hashlib
 import os
 import sys
+from functools import lru_cache
 from typing import List, Tuple, Dict
 
 # Add parent directory to path for imports
@@ -8,11 +11,13 @@ from config.settings import (
     LLM_PROVIDER, OLLAMA_BASE_URL, LLAMA_MODEL,
     TOP_K_RESULTS, MAX_CONTEXT_LENGTH
 )
-from embedding.embed_texts import get_embeddings
-from vector_db.vector_store import init_pinecone, query_similar
+from embedding.embed_texts import get_embeddings_async
+from vector_db.vector_store import init_pinecone, query_similar, encode_vector
 from llm.providers import get_llm_provider
 
-# Initialize LLM provider based on configuration
+# Initialize LLM provider based on configuration.
+# Cached so the query REPL doesn't rebuild the provider on every question.
+@lru_cache(maxsize=1)
 def get_llm():
     """Get the configured LLM provider."""
     if LLM_PROVIDER == 'ollama':
@@ -20,6 +25,11 @@ def get_llm():
     else:
         raise ValueError(f"Unknown LLM provider: {LLM_PROVIDER}. Available: 'ollama'")
 
+@lru_cache(maxsize=1)
+def _cached_index():
+    """Pinecone index client, built once and reused across queries."""
+    return init_pinecone()
+
 def build_prompt(question: str, email_snippets: List[str]) -> str:
     """
     Construct an augmented prompt by combining user question and retrieved email contexts.
@@ -32,12 +42,12 @@ def build_prompt(question: str, email_snippets: List[str]) -> str:
     )
     return prompt
 
-def generate_llm_answer(prompt: str, max_tokens: int = 512) -> str:
+async def generate_llm_answer(prompt: str, max_tokens: int = 512) -> str:
     """
     Send the prompt to the LLM and get the response.
     """
     llm = get_llm()
-    return llm.generate(
+    return await llm.generate_async(
         prompt,
         max_tokens=max_tokens,
         temperature=0.2,    # Lower temperature for more factual answers
@@ -46,24 +56,31 @@ def generate_llm_answer(prompt: str, max_tokens: int = 512) -> str:
         presence_penalty=0
     )
 
-def generate_answer(question: str) -> Tuple[str, List[Dict]]:
+async def generate_answer_async(question: str) -> Tuple[str, List[Dict]]:
     """
     Complete RAG pipeline: embed question, search emails, generate answer.
-    
+
     Args:
         question: User's question about emails
-        
+
     Returns:
         Tuple of (answer, source_emails)
     """
-    # Initialize Pinecone
-    index = init_pinecone()
-    
-    # Generate embedding for the question
-    question_embedding = get_embeddings([question])[0]
-    
+    # Pinecone init (cached after the first query) and the question
+    # embedding are independent, so run them concurrently; the sync
+    # Pinecone client goes through a worker thread.
+    index, question_embedding = await asyncio.gather(
+        asyncio.to_thread(_cached_index),
+        get_embeddings_async([question])
+    )
+    # Plain list at the query boundary, quantized the same way as the
+    # stored vectors when int8 storage is enabled
+    question_embedding = encode_vector(question_embedding[0])[0]
+
     # Search for relevant emails
-    matches = query_similar(index, question_embedding, top_k=TOP_K_RESULTS)
+    matches = await asyncio.to_thread(
+        query_similar, index, question_embedding, top_k=TOP_K_RESULTS
+    )
     
     if not matches:
         return "No relevant emails found for your question.", []
@@ -96,30 +113,44 @@ def generate_answer(question: str) -> Tuple[str, List[Dict]]:
             'snippet': metadata.get('snippet', '')
         })
     
-    # Build augmented prompt
-    prompt = build_prompt(question, email_contexts)
-    
-    # Truncate prompt if too long
-    if len(prompt) > MAX_CONTEXT_LENGTH:
-        # Keep question and truncate context
-        available_context_length = MAX_CONTEXT_LENGTH - len(question) - 100
-        truncated_contexts = []
-        current_length = 0
-        
-        for context in email_contexts:
-            if current_length + len(context) < available_context_length:
-                truncated_contexts.append(context)
-                current_length += len(context)
-            else:
-                break
-        
-        prompt = build_prompt(question, truncated_contexts)
-    
+    # Drop near-duplicate contexts (forwarded threads, auto-replies)
+    # before prompting: duplicated tokens only slow LLM decode down
+    seen = set()
+    unique_contexts = []
+    for context in email_contexts:
+        digest = hashlib.blake2b(context[:512].encode(), digest_size=8).digest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        unique_contexts.append(context)
+    email_contexts = unique_contexts
+
+    # Select as many contexts as fit the budget, tracking length
+    # incrementally so the oversized prompt is never materialized
+    # (100 chars of headroom covers the prompt template text)
+    contexts = []
+    total = len(question) + 100
+    for context in email_contexts:
+        if total + len(context) >= MAX_CONTEXT_LENGTH:
+            break
+        contexts.append(context)
+        total += len(context) + 2  # account for the "\n\n" joiner
+
+    # Build augmented prompt exactly once
+    prompt = build_prompt(question, contexts)
+
     # Generate answer
-    answer = generate_llm_answer(prompt)
-    
+    answer = await generate_llm_answer(prompt)
+
     return answer, source_emails
 
+def generate_answer(question: str) -> Tuple[str, List[Dict]]:
+    """
+    Synchronous wrapper around generate_answer_async for callers outside
+    an event loop (e.g. the main.py query REPL).
+    """
+    return asyncio.run(generate_answer_async(question))
+
 # --- Example usage ---
 if __name__ == "__main__":
     sample_question = "What is my next meeting about?"
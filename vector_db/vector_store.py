@@ -1,21 +1,33 @@
 import os
 import sys
 from typing import List, Dict, Optional
-from pinecone import Pinecone, ServerlessSpec
+import numpy as np
+from pinecone import ServerlessSpec
+
+# The gRPC client serializes vectors as binary protobuf instead of JSON
+# float strings (~3-5x fewer bytes per upsert); fall back to the REST
+# client on installs where gRPC support is unavailable
+try:
+    from pinecone.grpc import PineconeGRPC as Pinecone
+except ImportError:
+    from pinecone import Pinecone
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import PINECONE_API_KEY, PINECONE_ENV, PINECONE_INDEX_NAME, EMBEDDING_DIMENSION
+from config.settings import (
+    PINECONE_API_KEY, PINECONE_ENV, PINECONE_INDEX_NAME,
+    EMBEDDING_DIMENSION, EMBEDDING_INT8
+)
 
 def init_pinecone():
     """Initialize Pinecone connection and create index if needed."""
     pc = Pinecone(api_key=PINECONE_API_KEY)
-    
+
     # Create index if not exists
     if PINECONE_INDEX_NAME not in pc.list_indexes().names():
         print(f"Creating new Pinecone index: {PINECONE_INDEX_NAME}")
         pc.create_index(
-            name=PINECONE_INDEX_NAME, 
+            name=PINECONE_INDEX_NAME,
             dimension=EMBEDDING_DIMENSION,
             metric='cosine',
             spec=ServerlessSpec(
@@ -23,17 +35,39 @@ def init_pinecone():
                 region=PINECONE_ENV
             )
         )
-    
+
     index = pc.Index(PINECONE_INDEX_NAME)
     return index
 
-def upsert_embeddings(index, vectors: List[Dict]):
+def encode_vector(embedding: np.ndarray):
+    """
+    Encode an embedding for upsert or query.
+
+    Returns (values, extra_metadata). With EMBEDDING_INT8 off this is
+    just the float list; with it on, values are symmetrically scale-
+    quantized to int8 before going into the regular dense index, which
+    shrinks the JSON/wire payload (integer literals vs long float
+    strings) - the index itself still stores dense vectors. The
+    per-vector scale is kept in metadata for reconstruction. Cosine
+    similarity is scale-invariant, so per-vector scaling doesn't change
+    the ranking.
+    """
+    if not EMBEDDING_INT8:
+        return embedding.tolist(), {}
+    scale = float(np.max(np.abs(embedding))) or 1.0
+    quantized = np.round(embedding / scale * 127).astype(np.int8)
+    return quantized.tolist(), {"vec_scale": scale}
+
+def upsert_embeddings(index, vectors: List[Dict], batch_size: int = 100):
     """
-    Upsert embeddings into Pinecone.
+    Upsert embeddings into Pinecone in batches of `batch_size` vectors
+    (the API caps upserts at ~100 vectors / 2MB). Chunking is delegated
+    to the SDK's batched upsert, which works on both the REST and gRPC
+    clients.
     vectors: List of dicts with keys: id (str), values (List[float]), metadata (optional dict)
     Example: [{"id": "email1", "values": [...], "metadata": {...}}, ...]
     """
-    index.upsert(vectors)
+    index.upsert(vectors=vectors, batch_size=batch_size)
 
 def query_similar(index, vector: List[float], top_k: int = 5, filter_dict: Optional[Dict] = None):
     """
@@ -58,38 +92,43 @@ def query_similar(index, vector: List[float], top_k: int = 5, filter_dict: Optio
     result = index.query(**query_params)
     return result.matches
 
-def prepare_email_vectors(emails: List[Dict], embeddings: List[List[float]]) -> List[Dict]:
+def email_metadata(email: Dict) -> Dict:
+    """
+    Build the Pinecone metadata dict for a single email, dropping
+    empty fields.
+    """
+    metadata = {
+        "subject": email.get('subject', ''),
+        "snippet": email.get('snippet', '')[:500],  # Limit snippet length
+        "from": email.get('from', ''),
+        "date": email.get('date', ''),
+        "threadId": email.get('threadId', ''),
+        "body_preview": email.get('body', '')[:1000]  # Store first 1000 chars
+    }
+    return {k: v for k, v in metadata.items() if v}
+
+def prepare_email_vectors(emails: List[Dict], embeddings: np.ndarray) -> List[Dict]:
     """
     Prepare email data for Pinecone upsert with enhanced metadata.
-    
+
     Args:
         emails: List of email dictionaries
-        embeddings: List of embedding vectors
-        
+        embeddings: float32 array of embedding vectors, one row per email
+
     Returns:
         List of vectors ready for Pinecone upsert
     """
     vectors = []
     for email, embedding in zip(emails, embeddings):
-        # Create comprehensive metadata
-        metadata = {
-            "subject": email.get('subject', ''),
-            "snippet": email.get('snippet', '')[:500],  # Limit snippet length
-            "from": email.get('from', ''),
-            "date": email.get('date', ''),
-            "threadId": email.get('threadId', ''),
-            "body_preview": email.get('body', '')[:1000]  # Store first 1000 chars
-        }
-        
-        # Remove empty metadata fields
-        metadata = {k: v for k, v in metadata.items() if v}
-        
+        # Convert to a plain (possibly quantized) list only at the
+        # serialization boundary
+        values, extra = encode_vector(embedding)
         vectors.append({
             "id": email['id'],
-            "values": embedding,
-            "metadata": metadata
+            "values": values,
+            "metadata": {**email_metadata(email), **extra}
         })
-    
+
     return vectors
 
 def delete_all_vectors(index):